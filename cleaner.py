@@ -4,53 +4,102 @@
 Простой скрипт: при запуске удаляет пустые папки (рекурсивно) в D:\\lorett\\data\\decoded.
 """
 
+import errno
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
-def remove_empty_dirs(root: Path, *, dry_run: bool = True, remove_root: bool = False) -> tuple[int, int]:
+def remove_empty_dirs(
+    root: Path, *, dry_run: bool = True, remove_root: bool = False, workers: int = 1
+) -> tuple[int, int]:
     """
     Удаляет пустые директории внутри root (и, опционально, сам root если он пуст).
 
+    workers > 1 — верхнеуровневые подпапки root обходятся параллельно в пуле потоков
+    (scandir/rmdir отпускают GIL, так что медленный диск/сетевой том нагружается глубже).
+
     Возвращает (кол-во удалённых папок, кол-во ошибок).
     """
     removed = 0
     errors = 0
+    lock = threading.Lock()
 
     if not root.exists():
         raise FileNotFoundError(f"Path does not exist: {root}")
     if not root.is_dir():
         raise NotADirectoryError(f"Path is not a directory: {root}")
 
-    # bottom-up: сначала вложенные, затем родительские
-    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
-        p = Path(dirpath)
+    def report_removed(path: str) -> None:
+        nonlocal removed
+        with lock:
+            removed += 1
+            print(f"[DRY] rmdir {path}" if dry_run else f"[OK ] rmdir {path}")
+
+    def report_error(path: str, e: Exception) -> None:
+        nonlocal errors
+        with lock:
+            errors += 1
+            print(f"[ERR] {path}: {e}", file=sys.stderr)
 
-        # Быстрое условие пустоты: нет файлов и нет подпапок (после возможных удалений ниже).
-        # Но чтобы учесть гонки/права, дополнительно проверяем listdir.
+    def prune_entry(entry: os.DirEntry) -> bool:
+        # Симлинки на папки не трогаем — они делают родителя непустым.
+        # Любая ошибка (lstat без типа в DirEntry, RecursionError) — как и прочие: в errors, а не
+        # исключение из pool.map, которое оборвало бы всю чистку.
         try:
-            if not any(p.iterdir()):
-                if p == root and not remove_root:
-                    continue
-                if dry_run:
-                    print(f"[DRY] rmdir {p}")
-                else:
-                    p.rmdir()
-                    print(f"[OK ] rmdir {p}")
-                removed += 1
+            return entry.is_dir(follow_symlinks=False) and prune(entry.path, False)
         except Exception as e:
-            errors += 1
-            print(f"[ERR] {p}: {e}", file=sys.stderr)
+            report_error(entry.path, e)
+            return False
+
+    def prune(path: str, is_root: bool) -> bool:
+        """Обходит path снизу вверх; True — если path удалена (в dry_run — была бы удалена)."""
+        # Один scandir на папку: DirEntry уже знает тип, повторный listdir для проверки пустоты не нужен.
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except Exception as e:
+            report_error(path, e)
+            return False
+
+        # bottom-up: сначала вложенные, затем родительские.
+        if is_root and workers > 1 and len(entries) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pruned = list(pool.map(prune_entry, entries))
+        else:
+            pruned = [prune_entry(entry) for entry in entries]
+
+        if not all(pruned) or (is_root and not remove_root):
+            return False
+
+        try:
+            if not dry_run:
+                os.rmdir(path)
+            report_removed(path)
+            return True
+        except OSError as e:
+            # Гонки: папку наполнили, пока обходили поддерево (каталог живой) — просто пропускаем.
+            # На Windows ERROR_DIR_NOT_EMPTY тоже отображается в ENOTEMPTY.
+            if e.errno == errno.ENOTEMPTY:
+                return False
+            report_error(path, e)
+            return False
+        except Exception as e:
+            report_error(path, e)
+            return False
 
+    prune(str(root), True)
     return removed, errors
 
 
 ROOT = Path(r"D:\lorett\data\decoded")
+WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
 
 def main() -> int:
-    removed, errors = remove_empty_dirs(ROOT, dry_run=False, remove_root=False)
+    removed, errors = remove_empty_dirs(ROOT, dry_run=False, remove_root=False, workers=WORKERS)
     print(f"[DELETE] root={ROOT} removed_dirs={removed} errors={errors}")
     return 2 if errors else 0
 